@@ -5,10 +5,11 @@ However, there's a catch: the universe expanded in the time it took the light fr
 Due to something involving gravitational effects, only some space expands. 
 In fact, the result is that any rows or columns that contain no galaxies should all actually be twice as big.
 """
-import re
+import heapq
 import sys
 
 INPUT_FILE = './resources/day11_input.txt'
+EXPANSION_MULTIPLIER = 2
 
 
         
@@ -55,40 +56,358 @@ class GalaxyEdge:
         return abs(x2 - x1) + abs(y2 - y1)
 
 
-def domain_expansion(data: list) -> list:
-    new_data = []
-    for d in data:  # find the indexes of where no galaxies are present
-        r = ''.join([str(c) for c in d])
-        if (not re.search(r'#', r)):
-            new_data.append(d)
-        new_data.append(d)
+class Universe:
+    """
+    Galaxies of the unexpanded universe, recorded while streaming the puzzle input (see scan_universe).
+    The expansion is never materialized; it is applied as a mapping of the galaxy coordinates.
+    """
+    def __init__(self):
+        self.positions = []     # (row, col) of every galaxy
+        self.occupied_rows = 0  # bitset, bit i is set if row i contains a galaxy
+        self.occupied_cols = 0  # bitset, bit j is set if col j contains a galaxy
 
-    return new_data
+    def _empty_before(self, occupied: int) -> dict:
+        """
+        Maps each occupied line to the number of empty lines before it.
+        The k-th occupied line (counting from 0) at index i has i - k empty lines before it.
+        """
+        empty = {}
+        bits = bin(occupied)[:1:-1]  # bit i is at index i
+        rank = 0
+        line = bits.find('1')
+        while line != -1:
+            empty[line] = line - rank
+            rank += 1
+            line = bits.find('1', line + 1)
+
+        return empty
+
+    def empty_before(self) -> list:
+        """
+        Returns the (empty rows, empty cols) before each galaxy, in the order of positions.
+        """
+        rows = self._empty_before(self.occupied_rows)
+        cols = self._empty_before(self.occupied_cols)
+        return [(rows[pos[0]], cols[pos[1]]) for pos in self.positions]
+
+    def expanded_positions(self, multiplier: int = EXPANSION_MULTIPLIER) -> list:
+        """
+        Returns the position of every galaxy once every empty row and col
+        is replaced by multiplier rows and cols.
+        """
+        return [(pos[0] + (multiplier - 1) * empty[0], pos[1] + (multiplier - 1) * empty[1])
+                for pos, empty in zip(self.positions, self.empty_before())]
+
+def scan_universe(input_file: str = INPUT_FILE) -> Universe:
+    """
+    Streams the puzzle input line by line, recording the position of each galaxy
+    and which rows and cols are occupied, without ever storing the grid.
+    """
+    universe = Universe()
+    with open(input_file, 'r') as file:
+        for row, line in enumerate(file):
+            col = line.find('#')
+            if col != -1:
+                universe.occupied_rows |= 1 << row
+            while col != -1:
+                universe.positions.append((row, col))
+                universe.occupied_cols |= 1 << col
+                col = line.find('#', col + 1)
+
+    return universe
+
+def load_galaxy_positions() -> list:
+    """
+    Reads the puzzle input and returns the (row, col) position
+    of every galaxy in the expanded universe.
+    """
+    return scan_universe().expanded_positions(EXPANSION_MULTIPLIER)
+
+def _axis_distance_sum(coords) -> int:
+    """
+    Sum of |a - b| over every pair of coordinates on one axis.
+    Once sorted, the coordinate at index i is the larger one of i pairs,
+    so it adds coord * i minus the prefix sum of the coordinates before it.
+    """
+    total = 0
+    prefix = 0
+    for i, coord in enumerate(sorted(coords)):
+        total += coord * i - prefix
+        prefix += coord
+
+    return total
+
+def sum_pairwise_distances(positions: list) -> int:
+    """
+    Sum of the shortest path (manhattan distance) between every pair of galaxies.
+    The distance separates per axis, so each axis is summed on its own
+    in O(n log n) without building an edge for every pair.
+    """
+    return (_axis_distance_sum(pos[0] for pos in positions) +
+            _axis_distance_sum(pos[1] for pos in positions))
+
+def galaxy_distance_terms(universe: Universe) -> tuple:
+    """
+    Splits the sum of the shortest paths between every pair of galaxies into
+    (base, per_expansion), so that for any multiplier the total is
+    base + (multiplier - 1) * per_expansion.
+
+    Description:
+    After expansion a galaxy at row r moves to r + (multiplier - 1) * e(r), where e(r)
+    is the number of empty rows before it. e(r) grows with r, so every pairwise
+    distance is the unexpanded distance plus (multiplier - 1) times the distance in e.
+    The same holds for the columns.
+    """
+    base = sum_pairwise_distances(universe.positions)
+    per_expansion = sum_pairwise_distances(universe.empty_before())
+
+    return base, per_expansion
+
+def expanded_distance_sum(terms: tuple, multiplier: int = EXPANSION_MULTIPLIER) -> int:
+    """
+    Sum of the shortest paths between every pair of galaxies when every empty
+    row and col is replaced by multiplier rows and cols (see galaxy_distance_terms).
+    """
+    base, per_expansion = terms
+    return base + (multiplier - 1) * per_expansion
+
+class GalaxyIndex:
+    """
+    Spatial index for nearest galaxy queries, built once over the (expanded) galaxy positions.
+
+    Description:
+    Rotating (row, col) into (row + col, row - col) turns the manhattan distance into
+    the chebyshev distance max(|du|, |dv|). The rotated points are kept in a KD-tree
+    (stored implicitly: the median of every slice is the node, the halves are its children),
+    and a subtree is skipped once its distance on the split axis alone is no closer
+    than the k-th nearest galaxy found so far. No edges between galaxies are built.
+    """
+    def __init__(self, positions: list):
+        self.positions = positions
+        rotated = [(pos[0] + pos[1], pos[0] - pos[1]) for pos in positions]
+        order = list(range(len(positions)))
+        self.axes = [0] * len(positions)
+
+        stack = [(0, len(order), 0)]
+        while stack:
+            lo, hi, axis = stack.pop()
+            if hi - lo <= 0:
+                continue
+            order[lo:hi] = sorted(order[lo:hi], key=lambda i: rotated[i][axis])
+            mid = (lo + hi) // 2
+            self.axes[mid] = axis
+            stack.append((lo, mid, axis ^ 1))
+            stack.append((mid + 1, hi, axis ^ 1))
+
+        self.galaxies = order
+        self.points = [rotated[i] for i in order]
+
+    def k_nearest(self, galaxy: int, k: int = 1) -> list:
+        """
+        Returns the k nearest galaxies to positions[galaxy] as (distance, galaxy) tuples, nearest first.
+        """
+        pos = self.positions[galaxy]
+        query = (pos[0] + pos[1], pos[0] - pos[1])
+        nearest = []  # max heap of (-distance, galaxy)
+
+        stack = [(0, len(self.points), 0)]  # (lo, hi, lower bound of the distance)
+        while stack:
+            lo, hi, bound = stack.pop()
+            if lo >= hi or (len(nearest) == k and bound >= -nearest[0][0]):
+                continue
+            mid = (lo + hi) // 2
+            point = self.points[mid]
+            if self.galaxies[mid] != galaxy:
+                dist = max(abs(point[0] - query[0]), abs(point[1] - query[1]))
+                if len(nearest) < k:
+                    heapq.heappush(nearest, (-dist, self.galaxies[mid]))
+                elif dist < -nearest[0][0]:
+                    heapq.heapreplace(nearest, (-dist, self.galaxies[mid]))
+
+            diff = query[self.axes[mid]] - point[self.axes[mid]]
+            near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+            stack.append((*far, max(bound, abs(diff))))
+            stack.append((*near, bound))
+
+        return sorted((-dist, g) for dist, g in nearest)
+
+    def nearest(self, galaxy: int) -> tuple:
+        """
+        Returns the (distance, galaxy) of the nearest galaxy, or (0, None) if there is no other galaxy.
+        """
+        result = self.k_nearest(galaxy, 1)
+        return result[0] if result else (0, None)
+
+    def within_radius(self, galaxy: int, radius: int) -> list:
+        """
+        Returns every other galaxy at most radius away from positions[galaxy] as (distance, galaxy) tuples, nearest first.
+        """
+        pos = self.positions[galaxy]
+        query = (pos[0] + pos[1], pos[0] - pos[1])
+        found = []
+
+        stack = [(0, len(self.points))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            point = self.points[mid]
+            dist = max(abs(point[0] - query[0]), abs(point[1] - query[1]))
+            if dist <= radius and self.galaxies[mid] != galaxy:
+                found.append((dist, self.galaxies[mid]))
+
+            diff = query[self.axes[mid]] - point[self.axes[mid]]
+            if diff - radius <= 0:   # left half (smaller on the split axis) can be in range
+                stack.append((lo, mid))
+            if diff + radius >= 0:   # right half can be in range
+                stack.append((mid + 1, hi))
+
+        return sorted(found)
+
+class FenwickTree:
+    """
+    Binary indexed tree over the lines 0 to size - 1, supporting
+    point updates and prefix sums in O(log size).
+    """
+    def __init__(self, size: int):
+        self.tree = [0] * (size + 1)
+
+    def add(self, idx: int, value: int):
+        idx += 1
+        while idx < len(self.tree):
+            self.tree[idx] += value
+            idx += idx & -idx
+
+    def prefix_sum(self, idx: int) -> int:
+        """
+        Sum of the values of the lines before idx.
+        """
+        total = 0
+        while idx > 0:
+            total += self.tree[idx]
+            idx -= idx & -idx
+        return total
+
+class _AxisTracker:
+    """
+    Keeps the sum of the pairwise distances on one axis (rows or cols) of a dynamic set of galaxies.
+
+    Description:
+    The distance on one axis is split like galaxy_distance_terms into
+    - base: sum of |x_i - x_j|, updated in O(log n) with fenwick trees of the galaxy counts
+      and the coordinate sums on each side of the changed galaxy
+    - per_expansion: sum of |e(x_i) - e(x_j)|, which is the number of (galaxy, empty line, galaxy)
+      triples in that order. Each node of a segment tree holds, for its lines, the counts of
+      galaxies (g) and empty lines (e) and of the g-e, e-g and g-e-g ordered combinations,
+      so when a line becomes occupied or empty only its path to the root is recomputed.
+    """
+    EMPTY_LINE = (0, 1, 0, 0, 0)  # (g, e, ge, eg, geg)
+    NO_LINE = (0, 0, 0, 0, 0)
+
+    def __init__(self, size: int):
+        self.counts = FenwickTree(size)
+        self.coord_sums = FenwickTree(size)
+        self.line_counts = [0] * size
+        self.num_galaxies = 0
+        self.base = 0
+
+        self.size = 1
+        while self.size < size:
+            self.size *= 2
+        self.tree = [self.NO_LINE] * (2 * self.size)
+        for i in range(size):
+            self.tree[self.size + i] = self.EMPTY_LINE
+        for i in range(self.size - 1, 0, -1):
+            self.tree[i] = self._merge(self.tree[2 * i], self.tree[2 * i + 1])
+
+    def _merge(self, left: tuple, right: tuple) -> tuple:
+        return (left[0] + right[0],
+                left[1] + right[1],
+                left[2] + right[2] + left[0] * right[1],
+                left[3] + right[3] + left[1] * right[0],
+                left[4] + right[4] + left[2] * right[0] + left[0] * right[3])
+
+    def _distance_to_others(self, coord: int) -> int:
+        less = self.counts.prefix_sum(coord)
+        less_sum = self.coord_sums.prefix_sum(coord)
+        greater = self.num_galaxies - self.counts.prefix_sum(coord + 1)
+        greater_sum = self.coord_sums.prefix_sum(len(self.line_counts)) - \
+            self.coord_sums.prefix_sum(coord + 1)
+        return coord * less - less_sum + greater_sum - coord * greater
+
+    def update(self, coord: int, delta: int):
+        """
+        Adds (delta = 1) or removes (delta = -1) a galaxy on line coord.
+        """
+        if delta < 0:
+            self.counts.add(coord, delta)
+            self.coord_sums.add(coord, delta * coord)
+            self.num_galaxies += delta
+            self.base -= self._distance_to_others(coord)
+        else:
+            self.base += self._distance_to_others(coord)
+            self.counts.add(coord, delta)
+            self.coord_sums.add(coord, delta * coord)
+            self.num_galaxies += delta
+
+        self.line_counts[coord] += delta
+        count = self.line_counts[coord]
+        i = self.size + coord
+        self.tree[i] = (count, 0, 0, 0, 0) if count else self.EMPTY_LINE
+        i //= 2
+        while i:
+            self.tree[i] = self._merge(self.tree[2 * i], self.tree[2 * i + 1])
+            i //= 2
+
+    def per_expansion(self) -> int:
+        return self.tree[1][4]
+
+class DynamicGalaxySet:
+    """
+    Set of galaxies in a universe of the given (rows, cols) shape that can be added
+    and removed one at a time, keeping the sum of the shortest paths between every pair
+    of galaxies in the expanded universe up to date in O(log n) per update.
+    Rows and cols becoming occupied or empty are accounted for as part of each update.
+    """
+    def __init__(self, shape: tuple, multiplier: int = EXPANSION_MULTIPLIER):
+        self.multiplier = multiplier
+        self.shape = shape
+        self.galaxies = {}  # (row, col) -> number of galaxies at that position
+        self.rows = _AxisTracker(shape[0])
+        self.cols = _AxisTracker(shape[1])
+
+    def _check_bounds(self, pos: tuple):
+        if not (0 <= pos[0] < self.shape[0] and 0 <= pos[1] < self.shape[1]):
+            raise ValueError(f"{pos} is outside of the universe of shape {self.shape}")
+
+    def add(self, pos: tuple):
+        self._check_bounds(pos)
+        self.galaxies[pos] = self.galaxies.get(pos, 0) + 1
+        self.rows.update(pos[0], 1)
+        self.cols.update(pos[1], 1)
+
+    def remove(self, pos: tuple):
+        self._check_bounds(pos)
+        if not self.galaxies.get(pos):
+            raise KeyError(pos)
+        self.galaxies[pos] -= 1
+        if self.galaxies[pos] == 0:
+            del self.galaxies[pos]
+        self.rows.update(pos[0], -1)
+        self.cols.update(pos[1], -1)
+
+    def total_distance(self) -> int:
+        return expanded_distance_sum(
+            (self.rows.base + self.cols.base,
+             self.rows.per_expansion() + self.cols.per_expansion()),
+            self.multiplier)
 
 def open_file():
     galaxies = []
-    data = []
-    
-    with open(INPUT_FILE, 'r') as file:
-        # read file and store data in 2D array
-        data = [[*f.strip()] for f in file.readlines()]
-
-        # expand rows that contain no galaxies
-        data = domain_expansion(data)
-
-        # transpose 2D array to process expanding columns
-        l2 = list(map(list, zip(*data)))
-        l2 = domain_expansion(l2)
-
-        # transpose data again to reset orientation
-        data = list(map(list, zip(*l2)))
-        # replace # with number
-        galaxy_num = 1
-        for i in range(len(data)):
-          for j in range(len(data[i])):
-              if (data[i][j] == '#'):
-                  galaxies.append(GalaxyNode(galaxy_num, (i, j)))
-                  galaxy_num += 1
+    # replace # with number
+    for galaxy_num, pos in enumerate(load_galaxy_positions(), start=1):
+        galaxies.append(GalaxyNode(galaxy_num, pos))
 
     # connect galaxies
     for i in range(len(galaxies)):
@@ -98,10 +417,7 @@ def open_file():
     return galaxies
 
 if __name__ == "__main__":
-  galaxies = open_file()
-
-  sum_of_shortest = 0
-  for g in galaxies:
-      sum_of_shortest += g.sumPaths()
+  terms = galaxy_distance_terms(scan_universe())
+  sum_of_shortest = expanded_distance_sum(terms, EXPANSION_MULTIPLIER)
 
   print(f"Sum of the puzzle input length {sum_of_shortest}")
\ No newline at end of file
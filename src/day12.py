@@ -44,7 +44,7 @@ def validate(line: str, numbers: list):
 
 def open_file():
     def exfil_part1(line: str):
-        return line.split(" ")[0], eval(line.split(" ")[1])
+        return line.split(" ")[0], tuple([int(n) for n in re.findall(r'\d+', line)])
 
     def exfil_part2(line: str):
         springs = '?'.join([line.split(" ")[0]] * 5)
@@ -53,6 +53,51 @@ def open_file():
 
     return list(map(exfil_part1, open(INPUT_FILE, 'r'))), list(map(exfil_part2, open(INPUT_FILE, 'r')))
 
+def count_arrangements(springs: str, group: tuple) -> int:
+    """
+    Counts the arrangements of the spring row that match the group number combo,
+    iterating over (position, group index) instead of slicing strings.
+
+    Parameters:
+    - springs: spring row
+    - group: group combo
+
+    Description:
+    ways[i] is the number of arrangements of springs[i:] for group[j:]. The rows are
+    filled from the last group to the first, each only reading the row of the next group,
+    so two rows of len(springs) are kept at a time. Per position it is precomputed:
+    - run[i]: length of the run of non '.' characters starting at i (a group of n fits if run[i] >= n)
+    - next_hash[i]: index of the first '#' at or after i (a '#' can not be skipped)
+    Positions that leave less room than the remaining groups need (suffix sums of
+    the group lengths plus a '.' between each) are pruned.
+    Time is O(len(springs) * len(group)).
+    """
+    size = len(springs)
+    run = [0] * (size + 1)
+    next_hash = [size] * (size + 1)
+    for i in range(size - 1, -1, -1):
+        run[i] = run[i + 1] + 1 if springs[i] != '.' else 0
+        next_hash[i] = i if springs[i] == '#' else next_hash[i + 1]
+
+    # minimum room needed for group[j:]
+    need = [0] * (len(group) + 1)
+    for j in range(len(group) - 1, -1, -1):
+        need[j] = need[j + 1] + group[j] + (1 if j + 1 < len(group) else 0)
+
+    # no groups left: valid if and only if no '#' remains (index size + 1 is past the end)
+    ways = [1 if next_hash[i] == size else 0 for i in range(size + 1)] + [1]
+    for j in range(len(group) - 1, -1, -1):
+        length = group[j]
+        next_ways = ways
+        ways = [0] * (size + 2)
+        for i in range(size - need[j], -1, -1):
+            total = ways[i + 1] if springs[i] != '#' else 0  # spring i is operational
+            if run[i] >= length and (i + length == size or springs[i + length] != '#'):
+                total += next_ways[i + length + 1]  # group starts at spring i
+            ways[i] = total
+
+    return ways[0]
+
 @cache # used for memomization
 def permutate(springs: str, group: tuple):
     """
@@ -112,10 +157,10 @@ if __name__ == '__main__':
     sum_1 = 0
     sum_2 = 0
     for i in s_data1:
-        sum_1 += permutate(i[0], i[1])
+        sum_1 += count_arrangements(i[0], i[1])
         # sum_1 += count([c for c in i[0]], i[1])
     for i in s_data2:
-        sum_2 += permutate(i[0], i[1])
+        sum_2 += count_arrangements(i[0], i[1])
         # sum_1 += count([c for c in i[0]], i[1])
 
     print(sum_1)
@@ -20,28 +20,138 @@ Reference: https://adventofcode.com/2023/day/1
 Author: Richard Tran
 Status: Completed
 """
+import mmap
+import os
 import re
 import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 
 INPUT_FILE = './resources/day1_input.txt'
+USE_MMAP = False           # sum the calibration values with memory mapped worker processes
+USE_NUMPY = False          # sum the calibration values with the vectorized numpy engine
+CHUNK_SIZE = 1 << 24       # max bytes handed to a single worker at a time
+NON_DIGITS = bytes(b for b in range(256) if not 0x30 <= b <= 0x39)
 
 sum = 0
 calibration_values = []
 
+
+def split_byte_ranges(mm, chunk_size: int = CHUNK_SIZE) -> list:
+    """
+    Method splits the mapped file into (start, end) byte ranges of about chunk_size,
+    each ending right after a newline so no line is cut in half.
+    Ex:
+    split_byte_ranges(b"1abc2\npqr3stu8vwx\n", 4) -> [(0, 6), (6, 18)]
+    """
+    ranges = []
+    start = 0
+    size = len(mm)
+    while start < size:
+        end = mm.find(b'\n', min(start + chunk_size, size) - 1)
+        end = size if end == -1 else end + 1
+        ranges.append((start, end))
+        start = end
+
+    return ranges
+
+
+def sum_byte_range(byte_range: tuple, input_file: str = INPUT_FILE) -> int:
+    """
+    Worker method that maps the input file and sums the calibration values
+    of every line inside of byte_range, working directly on the bytes.
+    """
+    with open(input_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        chunk = mm[byte_range[0]:byte_range[1]]
+
+    total = 0
+    for line in chunk.split(b'\n'):
+        digits = line.translate(None, NON_DIGITS)  # drop every non ascii digit
+        if digits:
+            total += (digits[0] - 0x30) * 10 + (digits[-1] - 0x30)
+
+    return total
+
+
+def sum_calibration_values_mmap(input_file: str = INPUT_FILE, workers: int = None) -> int:
+    """
+    Method maps the input file, splits it into newline aligned byte ranges
+    and sums each range in a process pool. Only one chunk per worker is held
+    in memory at a time, so memory stays flat regardless of the file size.
+    """
+    if os.path.getsize(input_file) == 0:
+        return 0
+
+    with open(input_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        ranges = split_byte_ranges(mm)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        total = 0  # reduce the partial sums of each range
+        for partial_sum in pool.map(sum_byte_range, ranges, [input_file] * len(ranges)):
+            total += partial_sum
+
+    return total
+
+
+def sum_calibration_values_numpy(input_file: str = INPUT_FILE, number_words: dict = None) -> int:
+    """
+    Method loads the input file as a uint8 array and finds the first and last
+    digit of every line with array operations instead of a loop per line.
+    If number_words is given (Ex: {"one": "1"}), spelled out numbers are detected
+    by comparing shifted views of the array against each letter of the word.
+    """
+    buf = np.fromfile(input_file, dtype=np.uint8)
+    if buf.size == 0:
+        return 0
+    if buf[-1] != 0x0A:  # make sure the last line is newline terminated
+        buf = np.append(buf, np.uint8(0x0A))
+    newlines = np.flatnonzero(buf == 0x0A)
+
+    # digit value at each byte, -1 where there is no digit
+    values = np.where((buf >= 0x30) & (buf <= 0x39),
+                      buf.astype(np.int8) - 0x30, -1).astype(np.int8)
+
+    if number_words:
+        lowered = buf | 0x20  # ignore case for letters
+        for word, num in number_words.items():
+            size = buf.size - len(word) + 1
+            if size <= 0:
+                continue
+            match = np.ones(size, dtype=bool)
+            for offset, ch in enumerate(word.encode()):
+                match &= lowered[offset:offset + size] == ch
+            values[:size][match] = int(num)
+
+    positions = np.flatnonzero(values >= 0)
+    if positions.size == 0:
+        return 0
+    lines = np.searchsorted(newlines, positions)  # line number of each digit
+    breaks = np.flatnonzero(np.diff(lines))
+    first = values[positions[np.r_[0, breaks + 1]]].astype(np.int64)
+    last = values[positions[np.r_[breaks, positions.size - 1]]].astype(np.int64)
+
+    return int((first * 10 + last).sum())
+
+
 if __name__ == "__main__":
     start = time.time()
-    with open(INPUT_FILE, 'r') as f:  # open input file for processing
-        content = [line.strip() for line in f]  # load each line into an array
-
-        for c in content:  # iterate through each item in content
-            # extract numbers from string
-            extracted_nums = re.findall(r'\d', c)
-            size = len(extracted_nums)
-            value = ''.join([extracted_nums[0], extracted_nums[size - 1]])
-            calibration_values.append(int(value))
-
-    for c_val in calibration_values:
-        sum += c_val
+    if USE_MMAP:
+        sum = sum_calibration_values_mmap()
+    elif USE_NUMPY:
+        sum = sum_calibration_values_numpy()
+    else:
+        with open(INPUT_FILE, 'r') as f:  # open input file for processing
+            content = [line.strip() for line in f]  # load each line into an array
+
+            for c in content:  # iterate through each item in content
+                # extract numbers from string
+                extracted_nums = re.findall(r'\d', c)
+                size = len(extracted_nums)
+                value = ''.join([extracted_nums[0], extracted_nums[size - 1]])
+                calibration_values.append(int(value))
+
+        for c_val in calibration_values:
+            sum += c_val
 
     end = time.time()
     print(f"Part I answer: {sum}")
@@ -25,8 +25,11 @@ Status: Completed
 """
 import re
 import time
+from collections import deque
+from day1_part1 import sum_calibration_values_numpy
 
 INPUT_FILE = './resources/day1_input.txt'
+USE_NUMPY = False  # sum the calibration values with the vectorized numpy engine
 NUMBER_STRING = {
     "zero": "0",
     "one": "1",
@@ -45,6 +48,83 @@ REGEX_PATTERN = re.compile(
     fr'(?=({"|".join([key for key in NUMBER_STRING])}|[0-9]))', re.IGNORECASE)
 
 
+def _build_automaton(words: dict) -> tuple:
+    """
+    Method compiles the given words into an Aho-Corasick automaton and
+    flattens the failure links into a full transition table (DFA).
+    Every state maps to the digit of the word that ends there, if any.
+    Ex:
+    _build_automaton({"one": "1", "1": "1"}) -> (transitions, outputs)
+    """
+    transitions = [{}]
+    outputs = [None]
+    for word, value in words.items():
+        state = 0
+        for ch in word:
+            if ch not in transitions[state]:
+                transitions.append({})
+                outputs.append(None)
+                transitions[state][ch] = len(transitions) - 1
+            state = transitions[state][ch]
+        outputs[state] = value
+
+    # breadth first over the trie, so the failure state is always resolved first
+    fail = [0] * len(transitions)
+    queue = deque(transitions[0].values())
+    while queue:
+        state = queue.popleft()
+        for ch, nxt in list(transitions[state].items()):
+            queue.append(nxt)
+            if state != 0:
+                fail[nxt] = transitions[fail[state]].get(ch, 0)
+            if outputs[nxt] is None:
+                outputs[nxt] = outputs[fail[nxt]]
+        if state != 0:
+            transitions[state] = {**transitions[fail[state]], **transitions[state]}
+
+    # match regardless of case like REGEX_PATTERN
+    for table in transitions:
+        table.update({ch.upper(): nxt for ch, nxt in list(table.items())})
+
+    return transitions, outputs
+
+
+# every spelled out number plus the digits themselves
+_DIGIT_WORDS = {**NUMBER_STRING, **{v: v for v in NUMBER_STRING.values()}}
+# forward automaton finds the first digit, reversed automaton finds the last
+FORWARD_AUTOMATON = _build_automaton(_DIGIT_WORDS)
+BACKWARD_AUTOMATON = _build_automaton(
+    {key[::-1]: val for key, val in _DIGIT_WORDS.items()})
+
+
+def _scan_first_digit(chars, automaton: tuple):
+    transitions, outputs = automaton
+    state = 0
+    for ch in chars:
+        state = transitions[state].get(ch, 0)
+        if outputs[state]:
+            return outputs[state]
+
+    return None
+
+
+def extract_calibration_value(line: str) -> int:
+    """
+    Method scans the line forward only until the first digit (or spelled out number)
+    is found, then backward from the end only until the last one is found.
+    Overlapping numbers are still matched since each scan runs its own automaton.
+    Ex:
+    extract_calibration_value("zoneight234") -> 14
+    extract_calibration_value("xtwone3four") -> 24
+    """
+    first = _scan_first_digit(line, FORWARD_AUTOMATON)
+    if first is None:  # no digit on this line
+        return 0
+    last = _scan_first_digit(reversed(line), BACKWARD_AUTOMATON)
+
+    return int(first + last)
+
+
 def refactor_list(extracted: list) -> list:
     """
     Method iterates through an extracted list and changes it to the value accordingly.
@@ -64,23 +144,20 @@ def refactor_list(extracted: list) -> list:
 
 if __name__ == "__main__":
     start = time.time()
-    calibration_values = []
-    with open(INPUT_FILE, 'r') as f:  # open input file for processing
-        content = [line.strip() for line in f]  # load each line into an array
-
-        for c in content:  # iterate through each item in content
-            # must check matches where matches overlap. EX: oneight -> [1, 8]
-            results = [match.group(1)
-                       for match in re.finditer(REGEX_PATTERN, c)]
-            # PART II: change all occurance of number strings to number
-            extracted_nums = refactor_list(results)
-            size = len(extracted_nums)
-            value = ''.join([extracted_nums[0], extracted_nums[size - 1]])
-            calibration_values.append(int(value))
-
-    sum = 0
-    for c_val in calibration_values:
-        sum += c_val
+    if USE_NUMPY:
+        sum = sum_calibration_values_numpy(INPUT_FILE, NUMBER_STRING)
+    else:
+        calibration_values = []
+        with open(INPUT_FILE, 'r') as f:  # open input file for processing
+            content = [line.strip() for line in f]  # load each line into an array
+
+            for c in content:  # iterate through each item in content
+                # must check matches where matches overlap. EX: oneight -> [1, 8]
+                calibration_values.append(extract_calibration_value(c))
+
+        sum = 0
+        for c_val in calibration_values:
+            sum += c_val
 
     end = time.time()
     print(f'Part II answer: {sum}')
@@ -41,14 +41,16 @@ Author: Richard Tran
 Status: Completed
 """
 import re
-import sys
 import time
+from array import array
+from bisect import bisect_right
+import numpy as np
 
 INPUT_FILE = './resources/day2_input.txt'
 
-RED_REGEX = r'(\d+)red'
-BLUE_REGEX = r'(\d+)blue'
-GREEN_REGEX = r'(\d+)green'
+# single scanner for the whole record, Ex: "Game 1: 3 blue, 4 red"
+# group 1 -> game id, group 2 -> cube count, group 3 -> cube color
+RECORD_REGEX = re.compile(r'Game\s+(\d+)|(\d+)\s*([a-zA-Z]+)')
 
 NUM_CUBE_THRESHOLD = {
     'red': 12,
@@ -58,74 +60,206 @@ NUM_CUBE_THRESHOLD = {
 
 
 class Game_Record:
+    __slots__ = ('game_id', 'color_max')
 
     def __init__(self, record: str):
-        game_info = record.split(':')
-        self.game_id = int(re.findall(r'\d+', game_info[0])[0])
-        self.valid_config, self.cubed_min = self._process_pull_results(
-            game_info[1])
-
-    def _process_pull_results(self, game_log: str) -> bool:
-        pulls = game_log.replace(' ', '').split(';')
-        valid = True
-        red_cubes = -sys.maxsize
-        blu_cubes = -sys.maxsize
-        gre_cubes = -sys.maxsize
-
-        for pull_result in pulls:
-            red_matches = self._retrieve_color_count(RED_REGEX, pull_result)
-            blue_matches = self._retrieve_color_count(BLUE_REGEX, pull_result)
-            green_matches = self._retrieve_color_count(
-                GREEN_REGEX, pull_result)
-
-            # if any color in this pull result exceeds the threshold, game is invalid
-            if red_matches > NUM_CUBE_THRESHOLD['red']:
-                valid = False
-            if blue_matches > NUM_CUBE_THRESHOLD['blue']:
-                valid = False
-            if green_matches > NUM_CUBE_THRESHOLD['green']:
-                valid = False
-
-            if red_matches > red_cubes:
-                red_cubes = red_matches
-            if blue_matches > blu_cubes:
-                blu_cubes = blue_matches
-            if green_matches > gre_cubes:
-                gre_cubes = green_matches
-
-        # if code has gotten to this point, then all pulls in current Game is valid
-        return valid, (red_cubes * blu_cubes * gre_cubes)
-
-    def _retrieve_color_count(self, match: str, pull_result: str) -> int:
-        count = 0
-        try:
-            count = int(re.findall(match, pull_result)[0])
-        except IndexError:
-            pass
-
-        return count
+        self.game_id = 0
+        self.color_max = self._process_pull_results(record)
+
+    def _process_pull_results(self, record: str) -> dict:
+        """
+        Walks the record once and folds the maximum count seen for every color.
+        Any color name is accepted, not only red, green and blue.
+        Ex:
+        "Game 1: 3 blue, 4 red; 1 red, 2 green, 6 blue; 2 green" -> {'blue': 6, 'red': 4, 'green': 2}
+        """
+        color_max = {}
+        for game_id, count, color in RECORD_REGEX.findall(record):
+            if game_id:
+                self.game_id = int(game_id)
+                continue
+            count = int(count)
+            if count > color_max.get(color, 0):
+                color_max[color] = count
+
+        return color_max
+
+    def evaluate(self, threshold: dict = NUM_CUBE_THRESHOLD) -> tuple:
+        """
+        Returns if the game is possible with the bag loaded with threshold cubes
+        and the power of the minimum set of cubes (a color never pulled counts as 0).
+        Only computed on demand, the record itself keeps just the parsed maxima.
+        """
+        # a color that is not in the bag makes the game impossible
+        valid = all(count <= threshold.get(color, 0)
+                    for color, count in self.color_max.items())
+
+        power = 1
+        for color in threshold.keys() | self.color_max.keys():
+            power *= self.color_max.get(color, 0)
+
+        return valid, power
+
+
+class Game_Store:
+    """
+    Columnar store of every game, built in one streaming pass over the records.
+    Holds an array of game ids and one array per color of the maximum cubes pulled,
+    so both parts (and any other bag threshold) are reductions over the columns.
+    """
+
+    def __init__(self):
+        self.game_ids = array('q')
+        self.color_max = {}  # color -> array('q') aligned with game_ids
+
+    @classmethod
+    def from_file(cls, input_file: str = INPUT_FILE):
+        store = cls()
+        with open(input_file, 'r') as file:
+            for line in file:
+                if line.strip():
+                    store.add(Game_Record(line))
+
+        return store
+
+    def add(self, game: Game_Record):
+        for color in game.color_max.keys() - self.color_max.keys():
+            # backfill a color that was first seen in this game
+            self.color_max[color] = array('q', bytes(8 * len(self.game_ids)))
+        for color, column in self.color_max.items():
+            column.append(game.color_max.get(color, 0))
+        self.game_ids.append(game.game_id)
+
+    def _columns(self, colors) -> list:
+        return [np.frombuffer(self.color_max[color], dtype=np.int64)
+                if color in self.color_max else np.zeros(len(self.game_ids), dtype=np.int64)
+                for color in colors]
+
+    def possible_games_sum(self, threshold: dict = NUM_CUBE_THRESHOLD) -> int:
+        """
+        Returns the sum of the ids of the games possible with the bag loaded with threshold cubes.
+        """
+        valid = np.ones(len(self.game_ids), dtype=bool)
+        for color, column in zip(self.color_max, self._columns(self.color_max)):
+            valid &= column <= threshold.get(color, 0)
+
+        return int(np.frombuffer(self.game_ids, dtype=np.int64)[valid].sum())
+
+    def power_sum(self, threshold: dict = NUM_CUBE_THRESHOLD) -> int:
+        """
+        Returns the sum of the power of the minimum set of cubes for every game.
+        """
+        power = np.ones(len(self.game_ids), dtype=np.int64)
+        for column in self._columns(threshold.keys() | self.color_max.keys()):
+            power *= column
+
+        return int(power.sum())
+
+
+class Threshold_Index:
+    """
+    Offline dominance index for answering "which games are possible with this bag"
+    for a batch of bags at once.
+
+    Games are sorted by the first color and the bags by their first color count.
+    Sweeping the bags in that order, every game whose first color fits is inserted
+    into a 2D Fenwick tree over the (compressed) counts of the other two colors,
+    keyed by game id. A bag is then answered with one O(log^2) prefix query.
+    Games that pulled a color outside of the indexed colors are never possible.
+
+    Every call still inserts (and then removes) up to all n games, so a call costs
+    O((n + bags) log^2) and is only cheaper than Game_Store.possible_games_sum
+    when amortized over a large batch of bags; for a single bag use the plain scan.
+
+    The tree is allocated once and is dense, so it takes
+    O(distinct second counts * distinct third counts) memory.
+    """
+
+    def __init__(self, store: Game_Store, colors: tuple = ('red', 'green', 'blue')):
+        self.colors = colors
+        first, second, third = store._columns(colors)
+        game_ids = np.frombuffer(store.game_ids, dtype=np.int64)
+
+        indexed = np.ones(len(game_ids), dtype=bool)
+        for column in store._columns(store.color_max.keys() - set(colors)):
+            indexed &= column == 0
+
+        order = np.argsort(first[indexed], kind='stable')
+        self.first = first[indexed][order].tolist()
+        self.second = second[indexed][order].tolist()
+        self.third = third[indexed][order].tolist()
+        self.game_ids = game_ids[indexed][order].tolist()
+
+        # coordinate compression of the two colors kept in the fenwick tree
+        self.second_values = sorted(set(self.second))
+        self.third_values = sorted(set(self.third))
+        self.cells = [(bisect_right(self.second_values, second),
+                       bisect_right(self.third_values, third))
+                      for second, third in zip(self.second, self.third)]
+        self.tree = [[0] * (len(self.third_values) + 1)
+                     for _ in range(len(self.second_values) + 1)]
+
+    def _update(self, tree: list, i: int, j: int, value: int):
+        while i < len(tree):
+            k = j
+            while k < len(tree[i]):
+                tree[i][k] += value
+                k += k & -k
+            i += i & -i
+
+    def _query(self, tree: list, i: int, j: int) -> int:
+        total = 0
+        while i > 0:
+            k = j
+            while k > 0:
+                total += tree[i][k]
+                k -= k & -k
+            i -= i & -i
+
+        return total
+
+    def possible_games_sums(self, thresholds: list) -> list:
+        """
+        Returns the sum of the possible game ids for each bag in thresholds.
+        Each bag is a dict of color -> count (Ex: NUM_CUBE_THRESHOLD) and
+        the sums are returned in the same order as the bags were given.
+        """
+        bags = [tuple(bag.get(color, 0) for color in self.colors)
+                for bag in thresholds]
+        results = [0] * len(bags)
+
+        game = 0
+        for q in sorted(range(len(bags)), key=lambda q: bags[q][0]):
+            first, second, third = bags[q]
+            while game < len(self.game_ids) and self.first[game] <= first:
+                self._update(self.tree, *self.cells[game], self.game_ids[game])
+                game += 1
+            results[q] = self._query(self.tree,
+                                     bisect_right(self.second_values, second),
+                                     bisect_right(self.third_values, third))
+
+        # reset only the cells touched by this batch, so the tree can be reused
+        for inserted in range(game):
+            self._update(self.tree, *self.cells[inserted], -self.game_ids[inserted])
+
+        return results
 
 
 if __name__ == "__main__":
-    sum_1 = 0
-    sum_2 = 0
-    
-    with open(INPUT_FILE, 'r') as file:
-        game_records = [input_line for input_line in file]
-        start = time.time()
-        for game in game_records:
-            g = Game_Record(game)
-            if g.valid_config:
-                sum_1 += g.game_id
-        end = time.time()
-        print(f"Part I  answer: {sum_1}")
-        print(f"Time: {(end - start) * 10**3} ms")
-
-        start = time.time()
-        for game in game_records:
-            g = Game_Record(game)
-            sum_2 += g.cubed_min
-        end = time.time()
-
-        print(f"Part II answer: {sum_2}")
-        print(f"Time: {(end - start) * 10**3} ms")
+    start = time.time()
+    store = Game_Store.from_file(INPUT_FILE)  # parse every record only once
+    end = time.time()
+    print(f"Parse time: {(end - start) * 10**3} ms")
+
+    start = time.time()
+    sum_1 = store.possible_games_sum(NUM_CUBE_THRESHOLD)
+    end = time.time()
+    print(f"Part I  answer: {sum_1}")
+    print(f"Time: {(end - start) * 10**3} ms")
+
+    start = time.time()
+    sum_2 = store.power_sum(NUM_CUBE_THRESHOLD)
+    end = time.time()
+
+    print(f"Part II answer: {sum_2}")
+    print(f"Time: {(end - start) * 10**3} ms")
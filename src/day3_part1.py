@@ -27,13 +27,20 @@ Reference: https://adventofcode.com/2023/day/3
 Author: Richard Tran
 Status: Completed
 """
+import os
 import re
 import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import numpy as np
 
 INPUT_FILE = "./resources/day3_input.txt"
+STREAMING = False  # solve while reading, keeping only a three row window of the schematic
+PARALLEL = False   # solve horizontal bands of the schematic in a process pool
+SYMBOL_REGEX = re.compile(r'[^a-zA-Z0-9.]')
+NUMBER_REGEX = re.compile(r'\d+')
 sum_1 = 0
 
-part_numbers = []     # array to hold valid part numbers
 engine_schematic = [] # 2D array to load each character per line in INPUT_FILE
 
 def validate_part_number(row, col) -> bool:
@@ -66,48 +73,137 @@ def validate_part_number(row, col) -> bool:
 def is_number(char : str):
   return bool(re.search(r'\d', char))
 
-if __name__ == "__main__":
-  
-  # open file and load engine_schematic : 2D array
-  with open(INPUT_FILE, 'r') as file:
-    # read each line -> list of characters -> add to engine_schematic (2D array)
-    engine_schematic = [list(line.strip()) for line in file]
+def symbol_adjacency_mask(schematic : list):
+  """
+  Method builds a boolean mask of the whole schematic that is True
+  for every cell adjacent/diagonal to (or on) a special char.
+  The symbols are dilated once with the 8 neighbor shifts of a padded grid,
+  so positions outside of the schematic never wrap around.
+  """
+  lines = [''.join(row) for row in schematic]
+  width = max((len(l) for l in lines), default=0)
+  grid = np.frombuffer(''.join(l.ljust(width, '.') for l in lines).encode('ascii'),
+                       dtype=np.uint8).reshape(len(lines), width)
+
+  is_symbol = np.ones(256, dtype=bool)  # anything but [a-zA-Z0-9.] is a special char
+  for char in b'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789.':
+    is_symbol[char] = False
+
+  padded = np.pad(is_symbol[grid], 1)
+  mask = np.zeros(grid.shape, dtype=bool)
+  for i in range(3):
+    for j in range(3):
+      mask |= padded[i:i + grid.shape[0], j:j + grid.shape[1]]
+
+  return mask
+
+def sum_part_numbers(schematic : list) -> int:
+  """
+  Method sums every number (digit run on a row) that intersects
+  the symbol adjacency mask of the schematic.
+  """
+  mask = symbol_adjacency_mask(schematic)
+  total = 0
+  for row, line in enumerate(schematic):
+    for match in re.finditer(r'\d+', ''.join(line)):
+      if mask[row, match.start():match.end()].any():
+        total += int(match.group())
+
+  return total
+
+def schematic_windows(lines):
+  """
+  Generator that reads the schematic rows lazily and yields
+  (above, row, below) for each row as soon as the row below it is read.
+  Rows outside of the schematic are given as an empty string.
+  """
+  above, row = '', None
+  for line in lines:
+    line = line.strip()
+    if row is not None:
+      yield above, row, line
+      above = row
+    row = line
+
+  if row is not None:
+    yield above, row, ''
+
+def split_bands(lines : list, num_bands : int = None) -> list:
+  """
+  Method splits the schematic rows into horizontal bands of
+  (halo row above, rows, halo row below). The halo rows are only read
+  for adjacency, so every number and gear belongs to exactly one band.
+  """
+  num_bands = num_bands or os.cpu_count() or 1
+  band_size = max(-(-len(lines) // num_bands), 1)  # ceil division
+  bands = []
+  for lo in range(0, len(lines), band_size):
+    hi = min(lo + band_size, len(lines))
+    above = lines[lo - 1] if lo > 0 else ''
+    below = lines[hi] if hi < len(lines) else ''
+    bands.append((above, lines[lo:hi], below))
+
+  return bands
 
+def band_windows(band : tuple):
+  """
+  Generator that yields (above, row, below) for the rows owned by the band,
+  skipping the windows centered on its halo rows.
+  """
+  above, rows, below = band
+  return islice(schematic_windows([above, *rows, below]), 1, len(rows) + 1)
+
+def sum_window_part_numbers(windows) -> int:
+  """
+  Method sums the part numbers on the middle row of each (above, row, below) window.
+  """
+  total = 0
+  for window in windows:
+    for match in NUMBER_REGEX.finditer(window[1]):
+      lo, hi = max(match.start() - 1, 0), match.end() + 1
+      if any(SYMBOL_REGEX.search(line, lo, hi) for line in window):
+        total += int(match.group())
+
+  return total
+
+def stream_part_numbers(lines) -> int:
+  """
+  Method sums the part numbers of each row once the row below it is seen,
+  so only three rows of the schematic are in memory at a time.
+  """
+  return sum_window_part_numbers(schematic_windows(lines))
+
+def sum_band_part_numbers(band : tuple) -> int:
+  return sum_window_part_numbers(band_windows(band))
+
+def parallel_part_numbers(lines : list, workers : int = None) -> int:
+  """
+  Method sums the part numbers of each band in a process pool
+  and reduces the partial sums.
+  """
+  total = 0
+  with ProcessPoolExecutor(max_workers=workers) as pool:
+    for partial_sum in pool.map(sum_band_part_numbers, split_bands(lines, workers)):
+      total += partial_sum
+
+  return total
+
+if __name__ == "__main__":
   start = time.time()
-  # iterate through 2D array
-  for row, line in enumerate(engine_schematic):
-    idx = 0
-    while idx < len(line):
-      # check if line[idx] is a number
-      if (not is_number(line[idx])):
-        idx += 1
-        continue
-
-      # build number by iterating ahead
-      # at the same time check if there are any adjacent/diagonal special chars
-      num = ''
-      is_valid_part = False
-      while True:
-        if idx > len(line) - 1:        # break condition 1
-          break
-        if (not is_number(line[idx])): # break condition 2
-          break
-
-        num += line[idx]
-        if (not is_valid_part): # if number is still invalid, check if it COULD be valid
-          is_valid_part = validate_part_number(row, col=idx)
-        idx += 1
-
-      
-      # if valid, then add to part numbers
-      if is_valid_part:
-        part_numbers.append(int(num))
-      # skip n columns for next iteration
-    
-  
-  # find the sum of all valid part numbers
-  for num in part_numbers:
-    sum_1 += num
+  if STREAMING:
+    with open(INPUT_FILE, 'r') as file:
+      sum_1 = stream_part_numbers(file)
+  elif PARALLEL:
+    with open(INPUT_FILE, 'r') as file:
+      sum_1 = parallel_part_numbers(file.read().splitlines())
+  else:
+    # open file and load engine_schematic : 2D array
+    with open(INPUT_FILE, 'r') as file:
+      # read each line -> list of characters -> add to engine_schematic (2D array)
+      engine_schematic = [list(line.strip()) for line in file]
+
+    start = time.time()
+    sum_1 = sum_part_numbers(engine_schematic)
   end = time.time()
   print(f"Part I  answer: {sum_1}")
   print(f"Time: {(end - start) * 10**3} ms")
@@ -39,12 +39,14 @@ Author: Richard Tran
 Status: Completed
 """
 import time
-from day3_part1 import is_number, INPUT_FILE
+from concurrent.futures import ProcessPoolExecutor
+from day3_part1 import is_number, schematic_windows, band_windows, split_bands, INPUT_FILE, NUMBER_REGEX
 from functools import reduce
 import re
 
+STREAMING = False  # solve while reading, keeping only a three row window of the schematic
+PARALLEL = False   # solve horizontal bands of the schematic in a process pool
 engine_schematic = []
-schar_indices = []
 sum_2 = 0
 
 
@@ -216,6 +218,7 @@ def check_left_bubble(schar_row: int, schar_col: int) -> bool:
 
 
 def calculate_gear_ratio(gear: tuple) -> int:
+    row, col = gear
     # if the symbol fails the "bubble" check, then return 0
     if (not (check_upper_bubble(row, col) and check_lower_bubble(row, col))
             and not (check_left_bubble(row, col) and check_right_bubble(row, col))):
@@ -236,27 +239,130 @@ def calculate_gear_ratio(gear: tuple) -> int:
                   and isinstance(y, int) else x, gear_num)
 
 
+def build_number_index(schematic: list) -> tuple:
+    """
+    Method labels every number span of the schematic in one pass.
+
+    Returns:
+    tuple: (labels, values)
+        - labels: 2D list where each cell holds the id of the number it belongs to, or -1
+        - values: list of the integer value of each number id
+
+    Ex:
+    ["467..", "...*."] -> ([[0, 0, 0, -1, -1], [-1, -1, -1, -1, -1]], [467])
+    """
+    labels = []
+    values = []
+    for line in schematic:
+        line = ''.join(line)
+        row_labels = [-1] * len(line)
+        for match in re.finditer(r'\d+', line):
+            row_labels[match.start():match.end()] = [len(values)] * \
+                (match.end() - match.start())
+            values.append(int(match.group()))
+        labels.append(row_labels)
+
+    return labels, values
+
+
+def sum_gear_ratios(schematic: list) -> int:
+    """
+    Method finds every '*' adjacent to exactly two part numbers and sums their gear ratios.
+    Each gear looks up at most eight neighbor cells in the label index
+    and de-duplicates the number ids it finds.
+
+    Note: only '*' cells are gear candidates, as the puzzle defines a gear.
+    The bubble based calculate_gear_ratio path scored every special char next to two numbers.
+    """
+    labels, values = build_number_index(schematic)
+    total = 0
+    for row, line in enumerate(schematic):
+        line = ''.join(line)
+        col = line.find('*')
+        while col != -1:
+            span_ids = set()
+            for i in range(max(row - 1, 0), min(row + 2, len(labels))):
+                for j in range(max(col - 1, 0), min(col + 2, len(labels[i]))):
+                    if labels[i][j] != -1:
+                        span_ids.add(labels[i][j])
+
+            if len(span_ids) == 2:  # gear is valid if and only if it is next to exactly two numbers
+                first, second = span_ids
+                total += values[first] * values[second]
+            col = line.find('*', col + 1)
+
+    return total
+
+
+def sum_window_gear_ratios(windows) -> int:
+    """
+    Method sums the gear ratios of the gears on the middle row of each (above, row, below) window.
+    Like sum_gear_ratios, only '*' cells are gear candidates.
+    """
+    total = 0
+    for window in windows:
+        col = window[1].find('*')
+        while col != -1:
+            gear_num = []
+            for line in window:
+                # walk back to the start of a number that ends next to the gear
+                lo = min(max(col - 1, 0), len(line))
+                while lo > 0 and line[lo - 1].isdigit():
+                    lo -= 1
+                for match in NUMBER_REGEX.finditer(line, lo):
+                    if match.start() > col + 1:
+                        break
+                    if match.end() >= col:
+                        gear_num.append(int(match.group()))
+
+            if len(gear_num) == 2:  # gear is valid if and only if it is next to exactly two numbers
+                total += gear_num[0] * gear_num[1]
+            col = window[1].find('*', col + 1)
+
+    return total
+
+
+def stream_gear_ratios(lines) -> int:
+    """
+    Method sums the gear ratios of each row once the row below it is seen,
+    so only three rows of the schematic are in memory at a time.
+    """
+    return sum_window_gear_ratios(schematic_windows(lines))
+
+
+def sum_band_gear_ratios(band: tuple) -> int:
+    return sum_window_gear_ratios(band_windows(band))
+
+
+def parallel_gear_ratios(lines: list, workers: int = None) -> int:
+    """
+    Method sums the gear ratios of each band in a process pool
+    and reduces the partial sums.
+    """
+    total = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for partial_sum in pool.map(sum_band_gear_ratios, split_bands(lines, workers)):
+            total += partial_sum
+
+    return total
+
+
 if __name__ == "__main__":
-    with open(INPUT_FILE, 'r') as file:
-        # read each line -> list of characters -> add to engine_schematic (2D array)
-        lines = [line.strip() for line in file]
-        for l in lines:
-            pattern = re.compile(r'[^a-zA-Z0-9.]+')
-            i = [m.start() for m in list(pattern.finditer(l))]
-            engine_schematic.append(list(l))
-            schar_indices.append(i)
-
-    # iterate through special char indicies
-    # check if row consists of a special char, else goto next row
-    # check for symbols that are next to two numbers
-        # using a "bubble", check northern and southern part of the bubble,
-        # then check left and right
-        # if not found, then the symbol is not near two numbers
     start = time.time()
-    for row, list in enumerate(schar_indices):
-        for col in list:
-            sum_2 += calculate_gear_ratio((row, col))
+    if STREAMING:
+        with open(INPUT_FILE, 'r') as file:
+            sum_2 = stream_gear_ratios(file)
+    elif PARALLEL:
+        with open(INPUT_FILE, 'r') as file:
+            sum_2 = parallel_gear_ratios(file.read().splitlines())
+    else:
+        with open(INPUT_FILE, 'r') as file:
+            # read each line -> list of characters -> add to engine_schematic (2D array)
+            engine_schematic = [list(line.strip()) for line in file]
+
+        # label every number span once, then each gear only checks its eight neighbors
+        start = time.time()
+        sum_2 = sum_gear_ratios(engine_schematic)
     end = time.time()
     print(f"Part II answer: {sum_2}")
     print(f"Time: {(end - start) * 10**3} ms")
-
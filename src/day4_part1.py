@@ -1,77 +1,73 @@
-import re
 import time
+from array import array
 
 INPUT_FILE = './resources/day4_input.txt'
-"""
-'card n' : {
-  'winning_numbers' : {
-    int : num_of_matches
-  },
-  'numbers_pulled' : [],
-  'total_points' : int
-}
-"""
-colorful_cards = {}
 
 
-def calculate_points(matches: int):
-    total_points = 0
-    for i in range(matches):
-        if i == 0:  # one point for first match
-            total_points += 1
-            continue
-        total_points *= 2  # double the point of each match after the first match
+def encode_numbers(numbers : str) -> int:
+    """
+    Method encodes a list of card numbers as an integer bitmask, where bit n is set if n is present.
+    Python integers grow as needed, so numbers of any size are supported.
+    Ex:
+    encode_numbers("1 3 4") -> 0b11010
+    """
+    mask = 0
+    for num in numbers.split():
+        mask |= 1 << int(num)
 
-    return total_points
+    return mask
 
-def calculate_cards_total():
-    sum_1 = 0
-    for i in colorful_cards.keys():
-        sum_1 += colorful_cards[i]['total_points']
+def split_card(card_info : str) -> tuple:
+    """
+    Method splits a card into its (winning numbers, numbers scratched) sides.
+    """
+    winning, _, scratched = card_info.partition(':')[2].partition('|')
+    return winning, scratched
 
-    return sum_1
+def count_matches(card_info : str) -> int:
+    """
+    Method returns the number of scratched numbers that are winning numbers on the card,
+    by testing each scratched number against the bitmask of the winning numbers.
+    A number scratched more than once is counted for every occurrence.
+    Ex:
+    count_matches("Card 1: 41 48 83 86 17 | 83 86  6 31 17  9 48 53") -> 4
+    """
+    winning, scratched = split_card(card_info)
+    mask = encode_numbers(winning)
+    return sum(mask >> int(num) & 1 for num in scratched.split())
 
-def process_scratch_card(card_info : str, card_num : int):
+def iter_match_counts(input_file : str = INPUT_FILE):
     """
-    Method handles processing each scratch card.
-      1) splits the string with delimiter ':' and '|'
-      2) creates a dict of the winning numbers
-      3) creates a list of numbers scratched
-      4) iterates through numbers scratched and tries to increment the winning numbers
-      5) calculates the total points
-      6) stores the results into colorful_cards : dict
+    Generator that streams the puzzle input and yields the match count of each card in card order.
     """
-    pattern = r'[:|]'
-    card_set = re.split(pattern, card_info)
-    # dict object for winning numbers
-    winning_set = {int(key): 0 for key in card_set[1].split()}
-    # list of numbers you have scatched to reveal
-    numbers_scratched = [int(x) for x in card_set[2].split()]
-    # count the matches
-    for num in numbers_scratched:
-        try:
-            winning_set[num] += 1
-        except Exception:
-            pass
-    
-    # store the results
-    colorful_cards[card_num] = {
-        'winning_numbers' : winning_set,
-        'numbers_pulled' : numbers_scratched,
-        'total_points' : calculate_points(sum(winning_set.values()))
-    }
+    with open(input_file, 'r') as file:
+        for line in file:
+            if line.strip():
+                yield count_matches(line)
 
-def load_file():
-    with open(INPUT_FILE, 'r') as file:
-        lines = [line.strip() for line in file]
-        for idx, c in enumerate(lines):
-          process_scratch_card(c, idx + 1)
+def load_match_counts(input_file : str = INPUT_FILE) -> array:
+    """
+    Method streams the puzzle input and stores only the match count of each card,
+    in card order, as an unsigned int array (4 bytes per card).
+    """
+    return array('I', iter_match_counts(input_file))
+
+def calculate_match_counts_total(match_counts : array) -> int:
+    """
+    Method returns the total points of all the cards, where a card is worth
+    one point for the first match and doubles for each match after (1 << matches - 1).
+    """
+    sum_1 = 0
+    for matches in match_counts:
+        sum_1 += (1 << matches) >> 1
+
+    return sum_1
 
 if __name__ == "__main__":
     sum_1 = 0
-    load_file()
+    match_counts = load_match_counts()
     start = time.time_ns()
-    sum_1 = calculate_cards_total()
+    sum_1 = calculate_match_counts_total(match_counts)
     end = time.time_ns()
     
     print(f"Part I answer: {sum_1}")
@@ -1,49 +1,42 @@
 import time
+from collections import deque
 import day4_part1 as day4
 
-day4.load_file()  # load the file and populate day4.colorful_cards
-cards_owned = {key: 0 for key in day4.colorful_cards.keys()}
 
-
-def award_cards(winning_numbers: dict, card_num: int, num_of_copies: int):
+def count_total_cards(match_counts) -> int:
     """
-    Award cards based on the provided winning numbers and card information.
+    Count the total scratchcards owned once all the won copies are awarded.
     Parameters:
-    - winning_numbers (dict): A dictionary representing the winning numbers match.
-    - card_num (int): The card number for which awards are calculated.
-    - num_of_copies (int): The number of copies of the card that are present.
-    The method calculates the total matches in the winning numbers and increments
-    the count of awarded cards for each matching number, multiplied by the
-    specified number of copies.
+    - match_counts (iterable): The match count of each card, in card order (Ex: day4.iter_match_counts()).
+    Every card with n copies and m matches awards n copies to each of the next m cards.
+    Instead of updating each of those cards, the award is recorded in a running
+    difference array: +n on the next card and -n on the card after the last awarded one.
+    The difference array is a sliding window only as long as the largest match count,
+    so the cards are processed as a stream in O(n) time and O(max matches) memory.
     """
+    window = deque()  # window[0] is the difference for the current card
+    running = 0       # copies won by the current card
     total = 0
-    for i in winning_numbers:
-        total += winning_numbers[i]
-
-    if total == 0:
-        return
+    for matches in match_counts:
+        running += window.popleft() if window else 0
+        num_of_copies = running + 1  # plus the original card from the puzzle input
+        total += num_of_copies
 
-    for i in range(1, total + 1):
-        if card_num + i in cards_owned:
-            cards_owned[card_num + i] += num_of_copies
+        if matches == 0:
+            continue
+        if len(window) <= matches:
+            window.extend([0] * (matches + 1 - len(window)))
+        window[0] += num_of_copies
+        window[matches] -= num_of_copies
 
-    return
+    return total
 
 
 if __name__ == "__main__":
-    scratch_cards = day4.colorful_cards
     sum_2 = 0
 
-    # initially the number of cards we own is 0. Thus each iteration we add one since its in the puzzle input
     start = time.time_ns()
-    for card_num in scratch_cards.keys():
-        cards_owned[card_num] += 1
-        num_of_copies = cards_owned[card_num]
-        award_cards(scratch_cards[card_num]
-                    ['winning_numbers'], card_num, num_of_copies)
-
-        sum_2 += cards_owned[card_num]
+    sum_2 = count_total_cards(day4.iter_match_counts())
     end = time.time_ns()
     print(f"Part II answer: {sum_2}")
     print(f"Time: {(end - start)} ns")
-
@@ -25,57 +25,204 @@ Reference: https://adventofcode.com/2023/day/5
 Author: Richard Tran
 Status: Completed
 """
+from array import array
+from bisect import bisect_right
+from functools import reduce
 from sys import maxsize
+import numpy as np
+import re
 import time
 
 INPUT_FILE = "./resources/day5_input.txt"
+USE_COMPOSED_TABLE = False  # convert seed -> location with the composed breakpoint table
+FILL_SEED_MAP = False       # also record every seed's number in each category into seed_map
+MAP_HEADER_REGEX = re.compile(r'^([\w-]+?)-to-([\w-]+) map:')
 seed_map = {}
 conversion_map = {}
 
 
-def process_mapping(number: int, map:list) -> int:
+def compile_stage(map: list) -> tuple:
     """
-    number: the number to check in dest_category
-    map: list of tuples(src_category:int, dest_category:int, range:int)
+    Compiles a stage into sorted (starts, offsets) lists, where every number
+    from starts[i] up to starts[i + 1] is converted by adding offsets[i].
+    Gaps between the ranges of the map are filled with identity (offset 0) segments.
+
+    map: list of tuples(dest_start:int, src_start:int, range:int)
+
+    Ex:
+    compile_stage([(50, 98, 2), (52, 50, 48)])
+    -> ([-maxsize - 1, 50, 98, 100], [0, 2, -48, 0])
     """
-    result = number
-    for tuple in map:
-        src_category = tuple[0]
-        dest_category = tuple[1]
-        r = tuple[2]
+    starts = [-maxsize - 1]
+    offsets = [0]
+    for dest_start, src_start, r in sorted(map, key=lambda m: m[1]):
+        if src_start == starts[-1]:  # no gap since the previous range
+            offsets[-1] = dest_start - src_start
+        else:
+            starts.append(src_start)
+            offsets.append(dest_start - src_start)
+        starts.append(src_start + r)  # identity until the next range
+        offsets.append(0)
 
-        if dest_category <= number <= (dest_category + r):
-            result = src_category + (number - dest_category)
-            break
-    
-    return result
+    return starts, offsets
 
 
-def extract_seed_numbers():
+def lookup_stage(number: int, stage: tuple) -> int:
     """
-    Method extracts the seed numbers from the puzzle input
-    
+    Converts a single number through a compiled stage with a binary search.
+    """
+    starts, offsets = stage
+    return number + offsets[bisect_right(starts, number) - 1]
+
+
+def lookup_stage_batch(numbers, stage: tuple):
+    """
+    Converts a whole numpy array of numbers through a compiled stage at once.
+    """
+    starts, offsets = stage
+    idx = np.searchsorted(np.asarray(starts, dtype=np.int64), numbers, side='right') - 1
+    return numbers + np.asarray(offsets, dtype=np.int64)[idx]
+
+
+def compose_stages(first: tuple, second: tuple) -> tuple:
+    """
+    Composes two compiled stages into one, so converting through the result
+    is the same as converting through first and then second.
+    Each segment of first is split wherever its converted image crosses
+    a breakpoint of second; adjacent segments with the same offset are merged.
+
+    Ex:
+    compose_stages(([-maxsize - 1, 10, 20], [0, 5, 0]), ([-maxsize - 1, 18], [0, 100]))
+    -> ([-maxsize - 1, 10, 13, 20], [0, 5, 105, 100])
+    """
+    f_starts, f_offsets = first
+    s_starts, s_offsets = second
+    starts = []
+    offsets = []
+    for i, (lo, offset) in enumerate(zip(f_starts, f_offsets)):
+        hi = f_starts[i + 1] if i + 1 < len(f_starts) else None
+        # segment [lo, hi) of first is converted to [lo + offset, hi + offset)
+        j = bisect_right(s_starts, lo + offset) - 1
+        while True:
+            piece_start = max(lo, s_starts[j] - offset)
+            piece_offset = offset + s_offsets[j]
+            if offsets and offsets[-1] == piece_offset:
+                pass  # same conversion as the previous segment
+            elif starts and starts[-1] == piece_start:
+                offsets[-1] = piece_offset
+            else:
+                starts.append(piece_start)
+                offsets.append(piece_offset)
+
+            j += 1
+            if j == len(s_starts) or (hi is not None and s_starts[j] - offset >= hi):
+                break
+
+    return starts, offsets
+
+
+def compose_almanac(stages: dict) -> tuple:
+    """
+    Composes every compiled stage (in conversion order) into a single breakpoint table,
+    so a seed -> location conversion is one binary search (lookup_stage) instead of one per stage.
+    """
+    return reduce(compose_stages, stages.values())
+
+
+def convert_seeds(seeds, stages: dict, seed_map: dict = None):
+    """
+    Converts a vector of seed numbers through every compiled stage, one vectorized call per stage.
+
+    seeds: sequence of seed numbers
+    stages: {"seed_to_soil": compiled stage, ...} in conversion order
+    seed_map: if given, filled with each seed's number in every category (same shape as extract_seed_numbers)
+
+    returns:
+    numpy array of the location number of each seed
+    """
+    numbers = np.asarray(seeds, dtype=np.int64)
+    categories = {}
+    for name, stage in stages.items():
+        numbers = lookup_stage_batch(numbers, stage)
+        categories[name.split("_to_")[1]] = numbers
+
+    if seed_map is not None:
+        columns = {category: values.tolist() for category, values in categories.items()}
+        for i, seed in enumerate(np.asarray(seeds).tolist()):
+            seed_map[seed].update({category: values[i] for category, values in columns.items()})
+
+    return numbers
+
+
+class Almanac:
+    """
+    Compiled almanac, parsed from the puzzle input in a single pass (see load_almanac).
+
+    seeds: array of the seed numbers, in the order of the puzzle input
+    conversion_map: {"seed_to_soil": [(dest_start, src_start, range), ...], ...} in conversion order
+    stages: {"seed_to_soil": (starts, offsets), ...} each stage compiled into int arrays (see compile_stage)
     """
-    with open(INPUT_FILE, 'r') as file:
-        content = file.read().splitlines()
-        seeds = [int(s_num) for s_num in content[0].split(":")[1].split()]  # extract seed numbers
-        seeds.sort() # sort seed numbers in ascending order
-        # initialize seed_map
-        seed_map = {key: {
-            "soil": 0,
-            "fertilizer": 0,
-            "water": 0,
-            "light": 0,
-            "temperature": 0,
-            "humidity": 0,
-            "location": 0
-        } for key in seeds}
-
-        return seed_map
-
-def extract_conversion_mapping():
-    """
-    Method extracts the list of maps from the puzzle input
+
+    def __init__(self, seeds: list, conversion_map: dict):
+        self.seeds = array('q', seeds)
+        self.conversion_map = conversion_map
+        self.stages = {}
+        for name, map in conversion_map.items():
+            starts, offsets = compile_stage(map)
+            self.stages[name] = (array('q', starts), array('q', offsets))
+
+    def categories(self) -> list:
+        """
+        Returns the destination category of each stage, Ex: ["soil", "fertilizer", ..., "location"]
+        """
+        return [name.split("_to_")[1] for name in self.stages]
+
+
+def load_almanac(input_file: str = INPUT_FILE) -> Almanac:
+    """
+    Method streams the puzzle input once and builds the compiled Almanac.
+    Any "X-to-Y map:" header starts a new stage named "X_to_Y", so almanacs with
+    longer or custom stage chains are supported; stages are kept in the order they appear.
+    """
+    seeds = []
+    maps = {}
+    current = None
+    with open(input_file, 'r') as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("seeds:"):
+                seeds = [int(s_num) for s_num in line.split(":")[1].split()]
+                continue
+            header = MAP_HEADER_REGEX.match(line)
+            if header:
+                current = maps.setdefault(f"{header.group(1)}_to_{header.group(2)}", [])
+                continue
+            if current is not None:
+                # process line and split into a tuple of integers
+                # (dest_start, src_start, range)
+                current.append(tuple([int(num) for num in line.split()]))
+
+    return Almanac(seeds, maps)
+
+
+def extract_seed_numbers(almanac: Almanac = None):
+    """
+    Method extracts the seed numbers from the almanac (loaded from the puzzle input if not given)
+    and initializes the seed_map with every category of the stage chain.
+    """
+    almanac = almanac or load_almanac()
+    seeds = sorted(almanac.seeds)  # sort seed numbers in ascending order
+    # initialize seed_map
+    seed_map = {key: {category: 0 for category in almanac.categories()}
+                for key in seeds}
+
+    return seed_map
+
+def extract_conversion_mapping(almanac: Almanac = None):
+    """
+    Method extracts the list of maps from the almanac (loaded from the puzzle input if not given)
     and returns a dictionary.
 
     returns:
@@ -86,110 +233,33 @@ def extract_conversion_mapping():
             "water_to_light": [],
             "light_to_temperature": [],
             "temperature_to_humidity": [],
-            "humidity_to_location": []n
+            "humidity_to_location": []
         }
     """
-    with open(INPUT_FILE, 'r') as file:
-        content = file.read().splitlines()
-        seed_to_soil = []
-        soil_to_fertilizer = []
-        fertilizer_to_water = []
-        water_to_light = []
-        light_to_temperature = []
-        temperature_to_humidity = []
-        humidity_to_location = []
-
-        parsing_state = None
-        for line in content[1:]:
-            if line.startswith("seed-to-soil map"):
-                parsing_state = 0
-                continue
-            elif line.startswith("soil-to-fertilizer map"):
-                parsing_state = 1
-                continue
-            elif line.startswith("fertilizer-to-water map"):
-                parsing_state = 2
-                continue
-            elif line.startswith("water-to-light map"):
-                parsing_state = 3
-                continue
-            elif line.startswith("light-to-temperature map"):
-                parsing_state = 4
-                continue
-            elif line.startswith("temperature-to-humidity map"):
-                parsing_state = 5
-                continue
-            elif line.startswith("humidity-to-location map"):
-                parsing_state = 6
-                continue
-              
-
-            # process line and split into a tuple of integers
-            # (src_category, dest_category, range)
-            mapping = tuple([int(num) for num in line.strip().split()])
-            if mapping:
-                match(parsing_state): # append to proper list based on parsing state
-                    case 0:
-                        seed_to_soil.append(mapping)
-                    case 1:
-                        soil_to_fertilizer.append(mapping)
-                    case 2:
-                        fertilizer_to_water.append(mapping)
-                    case 3:
-                        water_to_light.append(mapping)
-                    case 4:
-                        light_to_temperature.append(mapping)
-                    case 5:
-                        temperature_to_humidity.append(mapping)
-                    case 6:
-                        humidity_to_location.append(mapping)
-                    case _:
-                        continue
-
-        conversion_map = {
-            "seed_to_soil": seed_to_soil,
-            "soil_to_fertilizer": soil_to_fertilizer,
-            "fertilizer_to_water": fertilizer_to_water,
-            "water_to_light": water_to_light,
-            "light_to_temperature": light_to_temperature,
-            "temperature_to_humidity": temperature_to_humidity,
-            "humidity_to_location": humidity_to_location
-        }
-        
-        return conversion_map
+    return (almanac or load_almanac()).conversion_map
 
 if __name__ == "__main__":
     start = time.time_ns()
-    seed_map = extract_seed_numbers()
-    conversion_map = extract_conversion_mapping()
-    for seed in seed_map.keys():
-        soil  = process_mapping(seed,  conversion_map["seed_to_soil"])
-        fert  = process_mapping(soil,  conversion_map["soil_to_fertilizer"])
-        water = process_mapping(fert,  conversion_map["fertilizer_to_water"])
-        light = process_mapping(water, conversion_map["water_to_light"])
-        temp  = process_mapping(light, conversion_map["light_to_temperature"])
-        hum   = process_mapping(temp,  conversion_map["temperature_to_humidity"])
-        loc   = process_mapping(hum,   conversion_map["humidity_to_location"])
-
-        # update seed mapping
-        seed_map[seed].update({
-            "soil": soil,
-            "fertilizer": fert,
-            "water": water,
-            "light": light,
-            "temperature": temp,
-            "humidity": hum,
-            "location": loc
-        })
+    almanac = load_almanac()  # the only read of the puzzle input
+    seeds = sorted(almanac.seeds)  # sort seed numbers in ascending order
+    seed_map = extract_seed_numbers(almanac) if FILL_SEED_MAP else None
+    # every stage is already compiled, convert every seed one stage at a time
+    stages = almanac.stages
+    if USE_COMPOSED_TABLE:
+        composed = compose_almanac(stages)
+        locations = [lookup_stage(seed, composed) for seed in seeds]
+        if seed_map is not None:
+            location = almanac.categories()[-1]
+            for seed, loc_num in zip(seeds, locations):
+                seed_map[seed][location] = loc_num
+        lowest = min(range(len(seeds)), key=locations.__getitem__)
+    else:
+        locations = convert_seeds(seeds, stages, seed_map)
+        lowest = int(locations.argmin())
 
     # determine the lowest location number
-    lowest_seed = maxsize
-    lowest_loc = maxsize
-    for seed in seed_map:
-        loc_num = seed_map[seed]["location"]
-        if loc_num < lowest_loc:
-            lowest_loc = loc_num
-            lowest_seed = seed
+    lowest_seed = seeds[lowest]
+    lowest_loc = int(locations[lowest])
     end = time.time_ns()
     
     print(f"Seed Number: {lowest_seed}")
@@ -12,11 +12,17 @@ Author: Richard Tran
 Status: Completed
 """
 
+import os
 import time
-from day5_part1 import INPUT_FILE, extract_conversion_mapping
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from day5_part1 import Almanac, load_almanac, compose_almanac
 import sys
 
+USE_COMPOSED_TABLE = False  # find the lowest location with the composed breakpoint table
+PARALLEL = False            # convert the seed populations in a process pool
 c_map = {}  # conversion map
+c_stages = {}  # compiled conversion stages (see compile_stage), in conversion order
 
 class Seed_Population:
     def __init__(self, seed_pop: tuple):
@@ -43,172 +49,90 @@ class Seed_Population:
         """
         s_pop = (
             self.seed_pop_range[0], self.seed_pop_range[0] + self.seed_pop_range[1] - 1)
-        converted_numbers = []
-        converted_numbers.append(s_pop)
-
-        # convert to soil
-        self.process_conversion_step(
-            converted_numbers, c_map["seed_to_soil"])
-        # convert to fertilizer
-        self.process_conversion_step(
-            converted_numbers, c_map["soil_to_fertilizer"])
-        # convert to water
-        self.process_conversion_step(
-            converted_numbers, c_map["fertilizer_to_water"])
-        # convert to light
-        self.process_conversion_step(
-            converted_numbers, c_map["water_to_light"])
-        # convert to temperature
-        self.process_conversion_step(
-            converted_numbers, c_map["light_to_temperature"])
-        # convert to humidity
-        self.process_conversion_step(
-            converted_numbers, c_map["temperature_to_humidity"])
-        # convert to location
-        self.process_conversion_step(
-            converted_numbers, c_map["humidity_to_location"])
+        converted_numbers = [s_pop]
+
+        # follow the stage chain, Ex: seed -> soil -> fertilizer -> ... -> humidity -> location
+        for stage in c_stages.values():
+            converted_numbers = self.process_conversion_step(converted_numbers, stage)
 
         # at this point, all seed numbers are converted to location numbers
         for i in converted_numbers:
             if i[0] < self.lowest_location:
                 self.lowest_location = i[0]
-        pass
 
-    def process_conversion_step(self, before_conversion: list, conversions: list):
+    def process_conversion_step(self, before_conversion: list, stage: tuple) -> list:
         """
         Converts a list of source categories to the destination category.
 
         Parameters:
             - before_conversion (list): A list of tuples with their source start and source end.
                 Example: [(79, 92)]
-            - conversions (list): A list of tuples representing the mapping.
+            - stage (tuple): The compiled (starts, offsets) stage of the mapping, see compile_stage.
                 Example: If converting from seed-to-soil
-                [(50, 98, 2), (52, 50, 48)]
+                compile_stage([(50, 98, 2), (52, 50, 48)])
 
         Returns:
-            list: A list of tuples containing the ranges of the converted values.
+            list: A sorted list of tuples containing the coalesced ranges of the converted values.
 
         Description:
-            This method is designed to convert source categories to the destination category.
-            The 'before_conversion' parameter is a list of tuples representing the source categories to be converted.
-            The 'conversions' parameter is a list of tuples representing the mapping rules.
-            The method returns a list of tuples containing the ranges of the converted values.
-
-            Note: The method was reworked to use range boundaries for splicing, addressing inefficiencies with enormous datasets.
+            Sweep line over the sorted source ranges and the sorted stage segments together.
+            The segment pointer only moves forward since the ranges are visited in order,
+            and each range is split on the segment boundaries it crosses.
+            Adjacent or overlapping converted ranges are merged afterwards, so the
+            number of ranges stays bounded from one stage to the next.
         """
+        starts, offsets = stage
         converted_list = []
-        for map in conversions:
-            if not before_conversion:  # temp list is empty now
-                break
-            for idx, s in enumerate(before_conversion):
-                r = self._check_boundaries(s[0], s[1], map)
-                if r:
-                    # remove number range since it will be split and converted
-                    s_pop = before_conversion.pop(idx)
-
-                    starting_index = r[0]
-                    ending_index = r[1]
-
-                    # add converted range to converted_list
-                    converted_list.append((r[2], r[3]))
-                    # splice "list" and store any unprocessed ones into temp_lists
-                    left_splice = (s_pop[0], starting_index - 1)
-                    right_splice = (ending_index + 1, s_pop[1])
-
-                    # add splices to before_conversion if and only if range is valid:
-                    # - left bound != right bound
-                    # - left bound is less than right bound
-                    if left_splice[0] != left_splice[1] and left_splice[0] < left_splice[1]:
-                        before_conversion.append(left_splice)
-                    if right_splice[0] != right_splice[1] and right_splice[0] < right_splice[1]:
-                        before_conversion.append(right_splice)
-
-        # add back the converted numbers to the before_conversion list
-        for i in converted_list:
-            before_conversion.append(i)
-
-    def _check_boundaries(self, src_left, src_right, conversion: tuple):
-        """
-        Check boundaries for seed number conversion.
+        idx = 0
+        for s_pop_start, s_pop_end in sorted(before_conversion):
+            while idx + 1 < len(starts) and starts[idx + 1] <= s_pop_start:
+                idx += 1
+            seg = idx
+            while seg < len(starts) and starts[seg] <= s_pop_end:
+                seg_end = starts[seg + 1] - 1 if seg + 1 < len(starts) else s_pop_end
+                left = max(s_pop_start, starts[seg])
+                right = min(s_pop_end, seg_end)
+                converted_list.append((left + offsets[seg], right + offsets[seg]))
+                seg += 1
 
-        Parameters:
-            - src_left (int): Left boundary of the source seed number range.
-            - src_right (int): Right boundary of the source seed number range.
-            - conversion (tuple): A tuple representing the conversion parameters.
-                - conversion[0] (int): Start point of the destination category.
-                - conversion[1] (int): Start point of the source category.
-                - conversion[2] (int): Length of the conversion range.
+        return coalesce_ranges(converted_list)
 
-        Returns:
-            tuple or None: A tuple representing the range to convert or None if the conversion is outside of the seed number range.
-            range_to_convert (tuple): representing the range to convert and splice
-            - range_to_convert[0] (int): starting source bound
-            - range_to_convert[1] (int): ending source bound
-            - range_to_convert[2] (int): calculated destination start
-            - range_to_convert[3] (int): calculated destination end
 
+def coalesce_ranges(ranges: list) -> list:
+    """
+    Sorts the inclusive (start, end) ranges and merges the ones that overlap or are adjacent.
+    Ex:
+    coalesce_ranges([(5, 9), (1, 3), (4, 4), (12, 15)]) -> [(1, 9), (12, 15)]
+    """
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+
+    return merged
 
-        Description:
-            The method checks if the conversion range is within the boundaries of the given source range.
-            If the conversion range is within the range, it calculates the corresponding range for conversion.
-            Returns None if the conversion is outside of the range.
-        """
-        # marking beginning and end of seed numbers
-        s_pop_start = src_left
-        s_pop_end = src_right
-
-        start_point = conversion[1]                     # src_category start
-        end_point = start_point + conversion[2] - 1     # src_category end
-
-        dest_start = conversion[0]                      # dest_category start
-        dest_end = conversion[2] + dest_start - 1       # dest_category end
-        diff = dest_start - start_point
-        # check if conversion range is outside of seed number range
-        if ((end_point < s_pop_start) or
-                (start_point > s_pop_end)):
-            return None
-
-        range_to_convert = ()
-        # case: conversion subset is on the left
-        if start_point <= s_pop_start and s_pop_start <= end_point <= s_pop_end:
-            range_to_convert = (s_pop_start, end_point,
-                                s_pop_start + diff, end_point + diff)
-        # case: conversion subset is in the middle
-        elif s_pop_start <= start_point <= s_pop_end and s_pop_start <= end_point <= s_pop_end:
-            range_to_convert = (start_point, end_point,
-                                start_point + diff, end_point + diff)
-        # case: conversion subset is on the right
-        elif s_pop_start <= start_point <= s_pop_end and s_pop_end <= end_point:
-            range_to_convert = (start_point, s_pop_end,
-                                start_point + diff, s_pop_end + diff)
-        # case: convert the entire array of seed numbers
-        elif start_point <= s_pop_start <= end_point and start_point <= s_pop_end <= end_point:
-            range_to_convert = (s_pop_start, s_pop_end,
-                                s_pop_start + diff, s_pop_end + diff)
-
-        return range_to_convert
-
-
-def extract_seed_numbers() -> list:
-    """
-    Method opens the puzzle input and
-    extracts the seed numbers and its respective range.
+
+def extract_seed_numbers(almanac: Almanac = None) -> list:
+    """
+    Method extracts the seed numbers and its respective range from
+    the almanac (loaded from the puzzle input if not given).
     Adds each item into a list and returns it after completing the
     process.
     """
-    with open(INPUT_FILE, 'r') as file:
-        content = file.read().splitlines()
-        seeds = [int(s_num) for s_num in content[0].split(":")[1].split()]
-        idx = 0
-        s_list = []  # store as tuples instead
-        while idx < len(seeds) - 1:
-            s_list.append((seeds[idx], seeds[idx + 1]))
-            idx += 2
-        s_list.sort()
-
-        seed_populations = []
-        for s_pop in s_list:
-            seed_populations.append(Seed_Population(s_pop))
+    seeds = (almanac or load_almanac()).seeds
+    idx = 0
+    s_list = []  # store as tuples instead
+    while idx < len(seeds) - 1:
+        s_list.append((seeds[idx], seeds[idx + 1]))
+        idx += 2
+    s_list.sort()
+
+    seed_populations = []
+    for s_pop in s_list:
+        seed_populations.append(Seed_Population(s_pop))
 
     return seed_populations
 
@@ -230,17 +154,144 @@ def find_lowest_location(seed_population: list) -> int:
     return lowest_num
 
 
+def _init_worker(stages: dict):
+    """
+    Process pool initializer, the compiled stages are shipped once per worker.
+    """
+    global c_stages
+    c_stages = stages
+
+
+def _convert_seed_range(task: tuple) -> tuple:
+    """
+    Worker method that converts one (population index, seed range) task
+    and returns (population index, lowest location).
+    """
+    idx, seed_pop = task
+    population = Seed_Population(seed_pop)
+    population.convert_seed_to_location()
+    return idx, population.lowest_location
+
+
+def split_seed_populations(seed_population: list, num_tasks: int) -> list:
+    """
+    Method splits the seed population ranges into (population index, (start, range)) tasks,
+    cutting any population larger than its share of the seeds, so one skewed population
+    is spread over several workers instead of stalling the pool.
+    """
+    total = sum(i.seed_pop_range[1] for i in seed_population)
+    max_range = max(-(-total // max(num_tasks, 1)), 1)  # ceil division
+    tasks = []
+    for idx, i in enumerate(seed_population):
+        start, r = i.seed_pop_range
+        for offset in range(0, r, max_range):
+            tasks.append((idx, (start + offset, min(max_range, r - offset))))
+
+    return tasks
+
+
+def find_lowest_location_parallel(seed_population: list, stages: dict = None, workers: int = None) -> int:
+    """
+    Method converts the Seed_Populations in a process pool and reduces
+    the per population minima, setting each object's lowest location number.
+    The compiled stages (Ex: Almanac.stages, defaults to c_stages) are shipped once per worker.
+    The chunk size adapts to the number of tasks so the workers stay balanced.
+    """
+    stages = c_stages if stages is None else stages
+    workers = workers or os.cpu_count() or 1
+    tasks = split_seed_populations(seed_population, workers * 4)
+    chunksize = max(len(tasks) // (workers * 4), 1)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(stages,)) as pool:
+        for idx, location in pool.map(_convert_seed_range, tasks, chunksize=chunksize):
+            if location < seed_population[idx].lowest_location:
+                seed_population[idx].lowest_location = location
+
+    lowest_num = sys.maxsize
+    for i in seed_population:
+        if i.lowest_location < lowest_num:
+            lowest_num = i.lowest_location
+
+    return lowest_num
+
+
+class Location_Index:
+    """
+    Range minimum index over the pieces of the composed almanac (see compose_almanac).
+
+    Inside a piece every seed is shifted by the same offset, so the lowest location
+    of a piece is at its first seed. The per piece minima are kept in a segment tree,
+    so the lowest location over any seed range is found in O(log pieces)
+    without converting the seeds through the stages again.
+    """
+
+    def __init__(self, almanac: tuple):
+        self.starts, self.offsets = almanac
+        self.size = 1
+        while self.size < len(self.starts):
+            self.size *= 2
+        self.tree = [sys.maxsize] * (2 * self.size)
+        for i, (start, offset) in enumerate(zip(self.starts, self.offsets)):
+            self.tree[self.size + i] = start + offset
+        for i in range(self.size - 1, 0, -1):
+            self.tree[i] = min(self.tree[2 * i], self.tree[2 * i + 1])
+
+    def _query(self, lo: int, hi: int) -> int:
+        """
+        Returns the lowest piece minimum of the pieces lo to hi (exclusive).
+        """
+        lowest_num = sys.maxsize
+        lo += self.size
+        hi += self.size
+        while lo < hi:
+            if lo & 1:
+                lowest_num = min(lowest_num, self.tree[lo])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                lowest_num = min(lowest_num, self.tree[hi])
+            lo //= 2
+            hi //= 2
+
+        return lowest_num
+
+    def lowest_location_in_range(self, seed_pop: tuple) -> int:
+        """
+        Finds the lowest location of a seed population range (start, range).
+        The piece holding the first seed starts mid piece, every other overlapping
+        piece starts inside of the range and is answered by the segment tree.
+        """
+        s_pop_start, s_pop_end = seed_pop[0], seed_pop[0] + seed_pop[1]
+        if s_pop_end <= s_pop_start:
+            return sys.maxsize
+        first = bisect_right(self.starts, s_pop_start) - 1
+        last = bisect_right(self.starts, s_pop_end - 1)  # pieces that start inside the range
+        return min(s_pop_start + self.offsets[first], self._query(first + 1, last))
+
+    def lowest_location(self, seed_populations: list) -> int:
+        """
+        Finds the lowest location over a set of seed population ranges [(start, range), ...].
+        """
+        return min((self.lowest_location_in_range(seed_pop) for seed_pop in seed_populations),
+                   default=sys.maxsize)
+
+
 if __name__ == "__main__":
     start = time.time_ns()
-    # initialize by opening file and extracting seed numbers and conversion maps
-    seed_objects = extract_seed_numbers()
-    c_map = extract_conversion_mapping()
-    # sort the conversion mappings
-    for i in c_map:
-        c_map[i].sort()
-        pass
-
+    # initialize by reading the file once and extracting seed numbers and conversion maps
+    almanac = load_almanac()
+    seed_objects = extract_seed_numbers(almanac)
+    c_map = almanac.conversion_map
+    c_stages = almanac.stages  # already compiled into sorted stages
+
+    if USE_COMPOSED_TABLE:
+        index = Location_Index(compose_almanac(c_stages))
+        lowest_loc = index.lowest_location([i.seed_pop_range for i in seed_objects])
+    elif PARALLEL:
+        lowest_loc = find_lowest_location_parallel(seed_objects, c_stages)
+    else:
+        lowest_loc = find_lowest_location(seed_objects)
     end = time.time_ns()
-    lowest_loc = find_lowest_location(seed_objects)
     print(f"Part II answer: {lowest_loc}")
     print(f"Time: {(end - start)} ns")